@@ -1,22 +1,65 @@
 import asyncio
+import atexit
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import asynccontextmanager
+import httpx
+import tiktoken
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt import create_react_agent, ToolNode
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI
+from aioconsole import ainput
 from dotenv import load_dotenv
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging; records are queued and written to stderr by a background thread
+log_queue = queue.Queue(-1)
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, log_handler, respect_handler_level=True)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(QueueHandler(log_queue))
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger("agent")
 
-# Define llm
+# Define llm; idle connections are kept for 5 minutes instead of httpx's default
+# 5 seconds, so the connection opened at startup survives until the first turn
 logger.info("Initializing ChatOpenAI model")
-model = ChatOpenAI(model="gpt-4o")
+model = ChatOpenAI(
+    model="gpt-4o",
+    http_async_client=httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300.0)
+    )
+)
+
+# Conversation history is kept verbatim so the provider's prompt cache keeps
+# hitting on the shared prefix; older turns are only summarized near the limit
+MAX_HISTORY_TOKENS = 100_000
+encoding = tiktoken.encoding_for_model("gpt-4o")
+
+# System prompt with comprehensive instructions, shared by the chat and batch entry points
+SYSTEM_PROMPT = (
+    "You have access to multiple tools that can help answer queries. "
+    "Use them dynamically and efficiently based on the user's request. "
+    "\n\nYou can use the database tools to store and retrieve persistent information: "
+    "\n- Key-Value operations: store_value, get_value, list_keys"
+    "\n- Notes operations: add_note, get_note, search_notes"
+    "\n- Table operations: create_table, list_tables, describe_table, insert_record, query_table, delete_table"
+    "\n- Record operations: update_record, delete_records"
+    "\n\nFor custom tables, you can:"
+    "\n1. Create tables with create_table(table_name, schema)"
+    "\n2. Insert data with insert_record(table_name, fields, values)"
+    "\n3. Query data with query_table(table_name, conditions, limit)"
+    "\n4. Update data with update_record(table_name, set_clause, where_clause)"
+    "\n5. Delete records with delete_records(table_name, where_clause)"
+    "\n\nWhen a request needs several independent lookups, request all of those tool calls in the same step."
+    "\n\nYou are a helpful knowledge assistant. Maintain context across the conversation."
+)
 
 # MCP server configuration
 MCP_SERVERS = {
@@ -46,77 +89,258 @@ MCP_SERVERS = {
     }
 }
 
-async def process_message(message, conversation_history):
-    """Process a single message using the agent."""
-    async with MultiServerMCPClient(MCP_SERVERS) as client:
-        # Load available tools
-        logger.info("Loading available tools from MCP servers")
-        tools = client.get_tools()
-        
-        # Create the agent
+async def run_mcp_server(name, config, tools_future, shutdown):
+    """Keep one MCP server connected until shutdown is set.
+    
+    The server is started and stopped inside this task, as its stdio/SSE
+    transport requires, and its tools are delivered through tools_future.
+    """
+    try:
+        async with MultiServerMCPClient({name: config}) as client:
+            tools_future.set_result(client.get_tools())
+            await shutdown.wait()
+    except Exception as e:
+        if not tools_future.done():
+            tools_future.set_exception(e)
+        raise
+
+@asynccontextmanager
+async def connect_mcp_servers(servers):
+    """Start all MCP servers concurrently and yield their combined tools."""
+    loop = asyncio.get_running_loop()
+    shutdown = asyncio.Event()
+    tools_futures = {name: loop.create_future() for name in servers}
+    tasks = [
+        asyncio.create_task(run_mcp_server(name, config, tools_futures[name], shutdown))
+        for name, config in servers.items()
+    ]
+    try:
+        # Startup takes as long as the slowest server instead of the sum of all
+        server_tools = await asyncio.gather(*tools_futures.values())
+        yield [tool for tools in server_tools for tool in tools]
+    finally:
+        shutdown.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def load_semantic_cache(system_prompt):
+    """Load the semantic response cache, or return None if it is unavailable.
+    
+    Meant to run in a worker thread: importing sentence-transformers and
+    loading the embedding model are both slow.
+    """
+    try:
+        from semantic_cache import SemanticCache
+        return SemanticCache(system_prompt)
+    except Exception as e:
+        logger.warning("Semantic cache disabled: %s", e)
+        return None
+
+def start_semantic_cache_load(system_prompt):
+    """Load the semantic cache in the background and return a future for it.
+    
+    The load runs on a daemon thread rather than the default executor, which
+    asyncio.run() joins on exit, so quitting never waits for the model.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def resolve(cache):
+        if not future.done():
+            future.set_result(cache)
+    
+    def load():
+        cache = load_semantic_cache(system_prompt)
+        try:
+            loop.call_soon_threadsafe(resolve, cache)
+        except RuntimeError:
+            # The chat already ended and the event loop is closed
+            pass
+    
+    threading.Thread(target=load, name="semantic-cache-loader", daemon=True).start()
+    return future
+
+@asynccontextmanager
+async def create_agent(servers=MCP_SERVERS):
+    """Start the MCP servers and yield a react agent using their tools.
+    
+    The servers keep running until the context exits.
+    """
+    logger.info("Loading available tools from MCP servers")
+    async with connect_mcp_servers(servers) as tools:
+        # The tool node runs all tool calls from one step concurrently and
+        # reports tool failures back to the model as messages
         logger.info("Creating agent")
-        agent = create_react_agent(model, tools)
-        
-        # Include the new message
-        current_messages = conversation_history + [HumanMessage(content=message)]
-        
-        # Process the query
-        logger.info(f"Processing query: {message}")
+        tool_node = ToolNode(tools, handle_tool_errors=True)
+        yield create_react_agent(model, tool_node)
+
+async def stream_response(agent, messages):
+    """Run the agent, printing the answer as it is generated, and return its text."""
+    response_chunks = []
+    async for event in agent.astream_events({"messages": messages}, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_start":
+            # Text streamed before a tool call is not part of the final answer,
+            # so end its line and keep only the last model call's output
+            if response_chunks:
+                print(flush=True)
+            response_chunks = []
+        elif kind == "on_chat_model_stream":
+            content = event["data"]["chunk"].content
+            if content:
+                response_chunks.append(content)
+                print(content, end="", flush=True)
+    
+    return "".join(response_chunks)
+
+async def process_message(message, conversation_history, agent, cache=None, stream=False):
+    """Process a single message using the agent.
+    
+    With stream=True the response is printed token by token as it arrives.
+    """
+    # Answer from the semantic cache when a similar message was already handled
+    cache_key = None
+    if cache is not None and cache.is_cacheable(message):
+        # Embedding is CPU-bound, so keep it off the event loop
+        cache_key = await asyncio.to_thread(cache.key, message, conversation_history)
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            if stream:
+                print(cached_response, end="", flush=True)
+            return cached_response
+    
+    # Include the new message
+    current_messages = conversation_history + [HumanMessage(content=message)]
+    
+    # Process the query
+    logger.info("Processing query: %s", message)
+    if stream:
+        latest_response = await stream_response(agent, current_messages)
+    else:
         agent_response = await agent.ainvoke({"messages": current_messages})
         
         # Get the latest response
         latest_response = agent_response["messages"][-1].content
-        
-        return latest_response
+    
+    if cache_key is not None:
+        cache.put(cache_key, latest_response)
+    
+    return latest_response
+
+async def process_messages_batch(messages, agent, conversation_history=None, cache=None, concurrency=8,
+                                 return_exceptions=False):
+    """Process independent messages concurrently with a shared agent.
+    
+    Each message is answered against the same conversation history, by default
+    just the chat's system prompt, and the responses are returned in the order
+    of the input messages. With return_exceptions=True a failed message yields
+    its exception in place of a response instead of failing the whole batch.
+    Build the agent with create_agent(), e.g.:
+    
+        async with create_agent() as agent:
+            responses = await process_messages_batch(prompts, agent)
+    """
+    if conversation_history is None:
+        conversation_history = [SystemMessage(content=SYSTEM_PROMPT)]
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def process_one(message):
+        async with semaphore:
+            return await process_message(message, conversation_history, agent, cache)
+    
+    logger.info("Processing batch of %s messages with concurrency %s", len(messages), concurrency)
+    return await asyncio.gather(
+        *(process_one(message) for message in messages),
+        return_exceptions=return_exceptions
+    )
+
+async def warm_up_model():
+    """Open the connection to the OpenAI API before the first user turn."""
+    try:
+        # Listing models costs no tokens but completes the TLS handshake on the
+        # client's connection pool, which later chat requests reuse
+        await model.root_async_client.models.list()
+        logger.info("OpenAI connection warmed up")
+    except Exception as e:
+        logger.warning("Could not warm up OpenAI connection: %s", e)
+
+def count_tokens(messages):
+    """Count the tokens used by the content of the given messages."""
+    return sum(len(encoding.encode(str(msg.content))) for msg in messages)
+
+async def summarize_history(conversation_history):
+    """Summarize the oldest half of the conversation into a single message.
+    
+    The system message stays first and the most recent turns are kept intact.
+    """
+    system_message, turns = conversation_history[0], conversation_history[1:]
+    
+    # Start the kept block on a human message so each exchange stays together
+    split = len(turns) // 2
+    while split < len(turns) and not isinstance(turns[split], HumanMessage):
+        split += 1
+    if split == 0 or split == len(turns):
+        return conversation_history
+    oldest, recent = turns[:split], turns[split:]
+    
+    logger.info("Summarizing %s oldest messages of conversation history", len(oldest))
+    transcript = "\n".join(f"{msg.type}: {msg.content}" for msg in oldest)
+    summary = await model.ainvoke([
+        SystemMessage(content="Summarize the following conversation, keeping any facts, names, and results needed to continue it."),
+        HumanMessage(content=transcript),
+    ])
+    
+    summary_message = SystemMessage(content=f"Summary of the earlier conversation:\n{summary.content}")
+    return [system_message, summary_message] + recent
 
 async def main():
     """Run the interactive chat loop."""
-    # Create the system message with comprehensive instructions
-    system_message = SystemMessage(content=(
-        "You have access to multiple tools that can help answer queries. "
-        "Use them dynamically and efficiently based on the user's request. "
-        "\n\nYou can use the database tools to store and retrieve persistent information: "
-        "\n- Key-Value operations: store_value, get_value, list_keys"
-        "\n- Notes operations: add_note, get_note, search_notes"
-        "\n- Table operations: create_table, list_tables, describe_table, insert_record, query_table, delete_table"
-        "\n- Record operations: update_record, delete_records"
-        "\n\nFor custom tables, you can:"
-        "\n1. Create tables with create_table(table_name, schema)"
-        "\n2. Insert data with insert_record(table_name, fields, values)"
-        "\n3. Query data with query_table(table_name, conditions, limit)"
-        "\n4. Update data with update_record(table_name, set_clause, where_clause)"
-        "\n5. Delete records with delete_records(table_name, where_clause)"
-        "\n\nYou are a helpful knowledge assistant. Maintain context across the conversation."
-    ))
-    
     # Initialize conversation history
+    system_message = SystemMessage(content=SYSTEM_PROMPT)
     conversation_history = [system_message]
+    history_tokens = count_tokens(conversation_history)
     
-    print("\nKnowledge Assistant with Database (type 'exit' to quit)\n")
-    print("Assistant: Hello! I'm your knowledge assistant with database capabilities. How can I help you today?")
+    # Load the embedding model for the semantic response cache in the background
+    # while the MCP servers start and the user types the first message
+    cache_future = start_semantic_cache_load(system_message.content)
     
-    while True:
-        # Get user input
-        user_input = input("\nYou: ")
-        
-        # Check if user wants to exit
-        if user_input.lower() in ['exit', 'quit', 'bye']:
-            print("\nAssistant: Goodbye! Have a great day!")
-            break
-        
-        # Process the message
-        response = await process_message(user_input, conversation_history)
-        
-        # Add the exchange to conversation history
-        conversation_history.append(HumanMessage(content=user_input))
-        conversation_history.append(AIMessage(content=response))
-        
-        # Print the response
-        print(f"\nAssistant: {response}")
-        
-        # Keep conversation history at a reasonable length
-        if len(conversation_history) > 10:  # Max 10 messages including system message
-            conversation_history = [system_message] + conversation_history[-9:]
+    # Connect to the OpenAI API in the background so the first turn skips the handshake
+    warm_up_task = asyncio.create_task(warm_up_model())
+    
+    try:
+        # Start the MCP servers once and keep them running for the whole session
+        async with create_agent() as agent:
+            print("\nKnowledge Assistant with Database (type 'exit' to quit)\n")
+            print("Assistant: Hello! I'm your knowledge assistant with database capabilities. How can I help you today?")
+            
+            while True:
+                # Get user input
+                user_input = await ainput("\nYou: ")
+                
+                # Check if user wants to exit
+                if user_input.lower() in ['exit', 'quit', 'bye']:
+                    print("\nAssistant: Goodbye! Have a great day!")
+                    break
+                
+                # Use the semantic cache once it has loaded, without waiting for it
+                cache = cache_future.result() if cache_future.done() else None
+                
+                # Process the message, printing the response as it streams in
+                print("\nAssistant: ", end="", flush=True)
+                response = await process_message(user_input, conversation_history, agent, cache, stream=True)
+                print()
+                
+                # Add the exchange to conversation history
+                exchange = [HumanMessage(content=user_input), AIMessage(content=response)]
+                conversation_history.extend(exchange)
+                history_tokens += count_tokens(exchange)
+                
+                # Only summarize once the history approaches the context window
+                if history_tokens > MAX_HISTORY_TOKENS:
+                    conversation_history = await summarize_history(conversation_history)
+                    history_tokens = count_tokens(conversation_history)
+    finally:
+        # Don't leave the warm-up request running if the chat ends early
+        warm_up_task.cancel()
 
 # Run the chat interface
 if __name__ == "__main__":
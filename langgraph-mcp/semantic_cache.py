@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import re
+import threading
+import faiss
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger("semantic_cache")
+
+# Messages about time-sensitive data or stored state (which later turns may change)
+# must always reach the agent
+UNCACHEABLE_PATTERN = re.compile(
+    r"\b(now|today|tonight|tomorrow|yesterday|current|currently|latest|weather|forecast|"
+    r"store|stored|save|saved|add|insert|update|delete|remove|create|drop|"
+    r"notes?|keys?|values?|tables?|records?|rows?|database|db|list|search|query|show|find|get)\b",
+    re.IGNORECASE
+)
+
+# Messages that refer back to earlier turns only mean the same thing in the same conversation
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|that|this|these|those|they|them|their|he|him|his|she|her|"
+    r"above|previous|earlier|again|more|else|also|instead|same)\b",
+    re.IGNORECASE
+)
+
+class SemanticCache:
+    """Return stored agent responses for messages similar to ones already answered."""
+
+    def __init__(self, system_prompt=None, model_name="all-MiniLM-L6-v2", threshold=0.92, context_size=2):
+        logger.info("Loading embedding model: %s", model_name)
+        self.embedder = SentenceTransformer(model_name)
+        self.index = faiss.IndexFlatIP(self.embedder.get_sentence_embedding_dimension())
+        self.threshold = threshold
+        self.context_size = context_size
+        # (context, response) pairs, parallel to the vectors in the index
+        self.entries = []
+        # Embedding of each system prompt seen, so it is computed only once;
+        # keys are built from worker threads, so guard it with a lock
+        self.system_embeddings = {}
+        self.system_lock = threading.Lock()
+        if system_prompt is not None:
+            self.system_embedding(system_prompt)
+
+    @staticmethod
+    def is_cacheable(message):
+        """Check whether responses to this message can be safely reused."""
+        return not UNCACHEABLE_PATTERN.search(message)
+
+    @staticmethod
+    def system_prompt_id(system_prompt):
+        """Return a stable id for the system prompt."""
+        return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+
+    def system_embedding(self, system_prompt):
+        """Return the cached embedding of the system prompt, e.g. for routing."""
+        with self.system_lock:
+            if system_prompt not in self.system_embeddings:
+                self.system_embeddings[system_prompt] = self.embedder.encode(
+                    [system_prompt], normalize_embeddings=True
+                )[0]
+            return self.system_embeddings[system_prompt]
+
+    @staticmethod
+    def is_follow_up(message, conversation_history):
+        """Check whether the message depends on earlier turns of the conversation."""
+        has_earlier_turns = any(msg.type != "system" for msg in conversation_history)
+        return has_earlier_turns and bool(FOLLOW_UP_PATTERN.search(message))
+
+    def context_hash(self, conversation_history):
+        """Hash the most recent messages so follow-up answers are only reused in the same context."""
+        recent = conversation_history[-self.context_size:]
+        digest = hashlib.sha256()
+        for msg in recent:
+            digest.update(f"{msg.type}:{msg.content}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def key(self, message, conversation_history):
+        """Build the cache key for a message: its normalized embedding and its context.
+        
+        The context is the system prompt id, so answers are never shared between
+        agents running different system prompts. Standalone messages are keyed on
+        that alone, so repeated questions hit the cache even as the chat history
+        grows; follow-ups also include the recent-message hash.
+        """
+        vector = self.embedder.encode([message], normalize_embeddings=True).astype("float32")
+        system_id = None
+        if conversation_history and conversation_history[0].type == "system":
+            system_id = self.system_prompt_id(conversation_history[0].content)
+        context_hash = None
+        if self.is_follow_up(message, conversation_history):
+            context_hash = self.context_hash(conversation_history)
+        return vector, (system_id, context_hash)
+
+    def get(self, key):
+        """Return the cached response for the key, or None on a miss."""
+        if self.index.ntotal == 0:
+            return None
+        vector, context = key
+        scores, ids = self.index.search(vector, min(5, self.index.ntotal))
+        for score, idx in zip(scores[0], ids[0]):
+            if score < self.threshold:
+                break
+            cached_context, response = self.entries[idx]
+            if cached_context == context:
+                logger.info("Semantic cache hit (similarity %.3f)", score)
+                return response
+        return None
+
+    def put(self, key, response):
+        """Store the response for the key."""
+        vector, context = key
+        self.index.add(vector)
+        self.entries.append((context, response))
@@ -1,43 +1,71 @@
 import os
+import re
+import asyncio
+import atexit
+import queue
 import sqlite3
+import aiosqlite
 import logging
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 import json
 from mcp.server.fastmcp import FastMCP
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging; records are queued and written to stderr by a background thread
+log_queue = queue.Queue(-1)
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, log_handler, respect_handler_level=True)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(QueueHandler(log_queue))
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger("database_server")
 
+@asynccontextmanager
+async def db_lifespan(server):
+    """Close the shared database connections when the server shuts down."""
+    try:
+        yield
+    finally:
+        await close_db_connections()
+
 # Initialize MCP
-mcp = FastMCP("Database")
+mcp = FastMCP("Database", lifespan=db_lifespan)
 
 # Database file path
 DB_FILE = "agent_database.db"
 
-def get_db_connection():
-    """Create a connection to the SQLite database."""
-    # Create the database file if it doesn't exist
-    conn = sqlite3.connect(DB_FILE)
-    
-    # Enable foreign key support
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    
-    # Create default tables if they don't exist
-    create_default_tables(conn)
-    
-    return conn
+# Statements used on the hot paths, kept as constants so every call reuses
+# the same string and hits the connection's prepared statement cache
+SQL_STORE_VALUE = (
+    "INSERT INTO key_value_store (key, value) VALUES (?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP"
+)
+SQL_GET_VALUE = "SELECT value FROM key_value_store WHERE key = ?"
+SQL_LIST_KEYS = "SELECT key FROM key_value_store ORDER BY key"
+SQL_ADD_NOTE = "INSERT INTO notes (title, content, tags) VALUES (?, ?, ?)"
+SQL_GET_NOTE = "SELECT * FROM notes WHERE id = ?"
+SQL_SEARCH_NOTES = "SELECT rowid AS id, title FROM notes_fts WHERE notes_fts MATCH ? ORDER BY rank LIMIT 50"
+
+# The full-text index and the shadow tables FTS5 creates for it
+FTS_TABLES = {"notes_fts", "notes_fts_data", "notes_fts_idx", "notes_fts_docsize", "notes_fts_config"}
+
+# Keywords that modify data or the connection, matched as whole words so identifiers
+# like created_at pass; REPLACE only as a statement, not the replace() function.
+# This is an early, friendlier rejection: the read-only connection is the real guard
+_DANGEROUS_RE = re.compile(
+    r"\b(?:insert|update|delete|drop|alter|truncate|create|grant|pragma|attach|detach|vacuum|reindex)\b"
+    r"|\breplace\s+into\b",
+    re.IGNORECASE
+)
 
-def create_default_tables(conn):
+async def create_default_tables(conn):
     """Create the default tables if they don't exist."""
     logger.info("Ensuring default tables exist")
-    cursor = conn.cursor()
-    
     # Create a simple key-value store table
-    cursor.execute('''
+    await conn.execute('''
     CREATE TABLE IF NOT EXISTS key_value_store (
         key TEXT PRIMARY KEY,
         value TEXT NOT NULL,
@@ -47,7 +75,7 @@ def create_default_tables(conn):
     ''')
     
     # Create a notes table
-    cursor.execute('''
+    await conn.execute('''
     CREATE TABLE IF NOT EXISTS notes (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         title TEXT NOT NULL,
@@ -58,8 +86,30 @@ def create_default_tables(conn):
     )
     ''')
     
+    # Create a full-text index over the notes, kept in sync by triggers
+    async with conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='notes_fts'") as cursor:
+        fts_exists = await cursor.fetchone() is not None
+    await conn.executescript('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, content, tags, content='notes', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts (rowid, title, content, tags) VALUES (new.id, new.title, new.content, new.tags);
+    END;
+    CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content, tags) VALUES ('delete', old.id, old.title, old.content, old.tags);
+    END;
+    CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content, tags) VALUES ('delete', old.id, old.title, old.content, old.tags);
+        INSERT INTO notes_fts (rowid, title, content, tags) VALUES (new.id, new.title, new.content, new.tags);
+    END;
+    ''')
+    if not fts_exists:
+        # Index notes written before the full-text table existed
+        await conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+    
     # Create a table to track created tables
-    cursor.execute('''
+    await conn.execute('''
     CREATE TABLE IF NOT EXISTS table_registry (
         table_name TEXT PRIMARY KEY,
         schema TEXT NOT NULL,
@@ -67,49 +117,174 @@ def create_default_tables(conn):
     )
     ''')
     
-    conn.commit()
+    await conn.commit()
+
+def build_fts_query(query):
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    terms = query.split()
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+# One SQL literal (single-quoted, double-quoted or bare) followed by a comma or the end
+_LITERAL_RE = re.compile(r"""\s*(?:'((?:[^']|'')*)'|"((?:[^"]|"")*)"|([^,'"]*?))\s*(,|$)""")
+
+def quote_identifier(name):
+    """Quote a table or column name for safe use in a statement."""
+    name = name.strip().strip('"')
+    return '"' + name.replace('"', '""') + '"'
+
+# A SQL numeric literal; Python's int()/float() would also accept nan, inf and 1_000
+_NUMERIC_RE = re.compile(r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?")
+
+def parse_bare_literal(literal):
+    """Convert an unquoted SQL literal into the Python value to bind."""
+    upper = literal.upper()
+    if upper == "NULL":
+        return None
+    if upper in ("TRUE", "FALSE"):
+        return int(upper == "TRUE")
+    if not _NUMERIC_RE.fullmatch(literal):
+        raise ValueError(f"Invalid value {literal!r}. Surround string values with quotes.")
+    try:
+        return int(literal)
+    except ValueError:
+        return float(literal)
+
+def parse_values(values):
+    """Split a comma-separated list of SQL literals into Python values for binding."""
+    parsed = []
+    pos = 0
+    while True:
+        match = _LITERAL_RE.match(values, pos)
+        if match is None:
+            raise ValueError(f"Could not parse values: {values}")
+        single_quoted, double_quoted, bare, separator = match.groups()
+        if single_quoted is not None:
+            parsed.append(single_quoted.replace("''", "'"))
+        elif double_quoted is not None:
+            parsed.append(double_quoted.replace('""', '"'))
+        elif bare:
+            parsed.append(parse_bare_literal(bare))
+        else:
+            raise ValueError(f"Missing value in: {values}")
+        if not separator:
+            return parsed
+        pos = match.end()
+
+def is_missing_table(error, table_name):
+    """Check whether an OperationalError was raised because the table does not exist."""
+    return str(error) == f"no such table: {table_name}"
+
+# Shared connection, opened on first use inside the server's event loop
+_CONN = None
+_CONN_LOCK = asyncio.Lock()
+
+# Separate read-only connection for execute_safe_query, so arbitrary SQL can never write
+_READ_ONLY_CONN = None
+
+# Set once the default tables have been created in this process
+_SCHEMA_READY = False
+
+async def ensure_schema(conn):
+    """Create the default tables the first time a connection is set up."""
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    await create_default_tables(conn)
+    _SCHEMA_READY = True
+
+async def get_db_connection():
+    """Return the shared database connection, opening it and setting up the schema once."""
+    global _CONN
+    if _CONN is not None:
+        return _CONN
+    
+    async with _CONN_LOCK:
+        if _CONN is None:
+            conn = await aiosqlite.connect(DB_FILE, isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            await conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA foreign_keys=ON;
+            """)
+            await ensure_schema(conn)
+            _CONN = conn
+    
+    return _CONN
+
+async def close_db_connections():
+    """Close the shared connections; their worker threads would otherwise keep the process alive."""
+    global _CONN, _READ_ONLY_CONN
+    async with _CONN_LOCK:
+        for conn in (_READ_ONLY_CONN, _CONN):
+            if conn is not None:
+                await conn.close()
+        _CONN = None
+        _READ_ONLY_CONN = None
+
+def deny_attach(action, *args):
+    """SQLite authorizer that blocks ATTACH/DETACH, which bypass the read-only file mode."""
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+async def get_read_only_connection():
+    """Return the shared read-only connection used for arbitrary queries."""
+    global _READ_ONLY_CONN
+    if _READ_ONLY_CONN is not None:
+        return _READ_ONLY_CONN
+    
+    # Make sure the database file and schema exist before opening it read-only
+    await get_db_connection()
+    async with _CONN_LOCK:
+        if _READ_ONLY_CONN is None:
+            conn = await aiosqlite.connect(f"file:{DB_FILE}?mode=ro", uri=True, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            await conn.execute("PRAGMA query_only=ON")
+            await conn.set_authorizer(deny_attach)
+            _READ_ONLY_CONN = conn
+    
+    return _READ_ONLY_CONN
 
 @mcp.tool()
-def create_table(table_name: str, schema: str) -> str:
+async def create_table(table_name: str, schema: str) -> str:
     """
     Create a new table in the database with the specified schema.
     The schema should be a string describing the columns and their types.
     Example: "id INTEGER PRIMARY KEY, name TEXT, age INTEGER, email TEXT UNIQUE"
     """
-    logger.info(f"Creating new table: {table_name}")
+    logger.info("Creating new table: %s", table_name)
     
     # Validate table name (basic security check)
     if not table_name.isalnum() and not (table_name.startswith(tuple('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')) and all(c.isalnum() or c == '_' for c in table_name)):
         return "Invalid table name. Table names must start with a letter and contain only letters, numbers, and underscores."
     
     # Reserved table names
-    reserved_tables = ['key_value_store', 'notes', 'table_registry', 'sqlite_master']
+    reserved_tables = ['key_value_store', 'notes', 'table_registry', 'sqlite_master', *FTS_TABLES]
     if table_name.lower() in reserved_tables:
         return f"Cannot create table '{table_name}'. This name is reserved."
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        conn = await get_db_connection()
         
         # Check if table already exists
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if cursor.fetchone():
-            conn.close()
+        async with conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,)) as cursor:
+            table_exists = await cursor.fetchone() is not None
+        if table_exists:
             return f"Table '{table_name}' already exists."
         
         # Create the table
         create_statement = f"CREATE TABLE {table_name} ({schema})"
-        cursor.execute(create_statement)
+        await conn.execute(create_statement)
         
         # Register the table
-        cursor.execute(
+        await conn.execute(
             "INSERT INTO table_registry (table_name, schema) VALUES (?, ?)",
             (table_name, schema)
         )
         
-        conn.commit()
-        conn.close()
-        
         result = f"Successfully created table '{table_name}'."
         logger.info(result)
         return result
@@ -120,21 +295,18 @@ def create_table(table_name: str, schema: str) -> str:
         return error_msg
 
 @mcp.tool()
-def list_tables() -> str:
+async def list_tables() -> str:
     """List all tables in the database."""
     logger.info("Listing all tables")
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = [row[0] for row in cursor.fetchall()]
+        conn = await get_db_connection()
         
-        conn.close()
+        async with conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name") as cursor:
+            tables = [row[0] for row in await cursor.fetchall()]
         
-        # Filter out system tables
-        tables = [table for table in tables if not table.startswith('sqlite_')]
+        # Filter out system tables and the full-text index
+        tables = [table for table in tables if not table.startswith('sqlite_') and table not in FTS_TABLES]
         
         if tables:
             result = "Available tables: " + ", ".join(tables)
@@ -150,34 +322,26 @@ def list_tables() -> str:
         return error_msg
 
 @mcp.tool()
-def describe_table(table_name: str) -> str:
+async def describe_table(table_name: str) -> str:
     """Get the schema of a specific table."""
-    logger.info(f"Describing table: {table_name}")
+    logger.info("Describing table: %s", table_name)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
-            conn.close()
-            return f"Table '{table_name}' does not exist."
+        conn = await get_db_connection()
         
         # Get table schema
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
+        async with conn.execute(f"PRAGMA table_info({table_name})") as cursor:
+            columns = await cursor.fetchall()
         
-        conn.close()
+        # PRAGMA table_info returns no rows for a missing table
+        if not columns:
+            return f"Table '{table_name}' does not exist."
         
-        if columns:
-            result = f"Schema for table '{table_name}':\n"
-            result += "\n".join([f"{col[1]} ({col[2]}){' PRIMARY KEY' if col[5] else ''}" for col in columns])
-            
-            logger.info(f"Retrieved schema for table '{table_name}'")
-            return result
-        else:
-            return f"No columns found for table '{table_name}'"
+        result = f"Schema for table '{table_name}':\n"
+        result += "\n".join([f"{col[1]} ({col[2]}){' PRIMARY KEY' if col[5] else ''}" for col in columns])
+        
+        logger.info("Retrieved schema for table '%s'", table_name)
+        return result
     
     except Exception as e:
         error_msg = f"Error describing table: {str(e)}"
@@ -185,35 +349,39 @@ def describe_table(table_name: str) -> str:
         return error_msg
 
 @mcp.tool()
-def insert_record(table_name: str, fields: str, values: str) -> str:
+async def insert_record(table_name: str, fields: str, values: str) -> str:
     """
     Insert a record into a table.
     fields: Comma-separated list of column names
     values: Comma-separated list of values (surround string values with quotes)
     Example: insert_record("users", "name,age", "'John Doe',30")
     """
-    logger.info(f"Inserting record into table {table_name}")
+    logger.info("Inserting record into table %s", table_name)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        conn = await get_db_connection()
         
-        # Check if table exists
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
-            conn.close()
-            return f"Table '{table_name}' does not exist."
+        # Bind the values as parameters so the statement text only depends on
+        # the table and columns, and SQLite can reuse its prepared statement
+        field_list = [field.strip() for field in fields.split(",")]
+        value_list = parse_values(values)
+        if len(field_list) != len(value_list):
+            return f"Got {len(field_list)} field(s) but {len(value_list)} value(s)."
         
         # Insert the record
-        insert_statement = f"INSERT INTO {table_name} ({fields}) VALUES ({values})"
-        cursor.execute(insert_statement)
+        columns = ", ".join(map(quote_identifier, field_list))
+        placeholders = ", ".join("?" * len(value_list))
+        insert_statement = f"INSERT INTO {quote_identifier(table_name)} ({columns}) VALUES ({placeholders})"
+        try:
+            cursor = await conn.execute(insert_statement, value_list)
+        except sqlite3.OperationalError as e:
+            if is_missing_table(e, table_name):
+                return f"Table '{table_name}' does not exist."
+            raise
         
         # Get the rowid of the last inserted row
         last_id = cursor.lastrowid
         
-        conn.commit()
-        conn.close()
-        
         result = f"Successfully inserted record into '{table_name}' with ID {last_id}."
         logger.info(result)
         return result
@@ -224,35 +392,30 @@ def insert_record(table_name: str, fields: str, values: str) -> str:
         return error_msg
 
 @mcp.tool()
-def update_record(table_name: str, set_clause: str, where_clause: str) -> str:
+async def update_record(table_name: str, set_clause: str, where_clause: str) -> str:
     """
     Update records in a table.
     set_clause: Comma-separated list of column=value assignments
     where_clause: Condition to specify which records to update
     Example: update_record("users", "age=31, status='active'", "name='John Doe'")
     """
-    logger.info(f"Updating records in table {table_name}")
+    logger.info("Updating records in table %s", table_name)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
-            conn.close()
-            return f"Table '{table_name}' does not exist."
+        conn = await get_db_connection()
         
         # Update the records
         update_statement = f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}"
-        cursor.execute(update_statement)
+        try:
+            cursor = await conn.execute(update_statement)
+        except sqlite3.OperationalError as e:
+            if is_missing_table(e, table_name):
+                return f"Table '{table_name}' does not exist."
+            raise
         
         # Get the number of rows affected
         rows_affected = cursor.rowcount
         
-        conn.commit()
-        conn.close()
-        
         result = f"Successfully updated {rows_affected} record(s) in '{table_name}'."
         logger.info(result)
         return result
@@ -263,34 +426,29 @@ def update_record(table_name: str, set_clause: str, where_clause: str) -> str:
         return error_msg
 
 @mcp.tool()
-def delete_records(table_name: str, where_clause: str) -> str:
+async def delete_records(table_name: str, where_clause: str) -> str:
     """
     Delete records from a table.
     where_clause: Condition to specify which records to delete
     Example: delete_records("users", "status='inactive'")
     """
-    logger.info(f"Deleting records from table {table_name}")
+    logger.info("Deleting records from table %s", table_name)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
-            conn.close()
-            return f"Table '{table_name}' does not exist."
+        conn = await get_db_connection()
         
         # Delete the records
         delete_statement = f"DELETE FROM {table_name} WHERE {where_clause}"
-        cursor.execute(delete_statement)
+        try:
+            cursor = await conn.execute(delete_statement)
+        except sqlite3.OperationalError as e:
+            if is_missing_table(e, table_name):
+                return f"Table '{table_name}' does not exist."
+            raise
         
         # Get the number of rows affected
         rows_affected = cursor.rowcount
         
-        conn.commit()
-        conn.close()
-        
         result = f"Successfully deleted {rows_affected} record(s) from '{table_name}'."
         logger.info(result)
         return result
@@ -301,7 +459,7 @@ def delete_records(table_name: str, where_clause: str) -> str:
         return error_msg
 
 @mcp.tool()
-def query_table(table_name: str, conditions: str = "", limit: int = 10) -> str:
+async def query_table(table_name: str, conditions: str = "", limit: int = 10) -> str:
     """
     Query records from a table with optional conditions.
     table_name: Name of the table to query
@@ -309,17 +467,10 @@ def query_table(table_name: str, conditions: str = "", limit: int = 10) -> str:
     limit: Maximum number of records to return
     Example: query_table("users", "age > 25", 5)
     """
-    logger.info(f"Querying table {table_name}")
+    logger.info("Querying table %s", table_name)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
-            conn.close()
-            return f"Table '{table_name}' does not exist."
+        conn = await get_db_connection()
         
         # Build the query
         query = f"SELECT * FROM {table_name}"
@@ -328,31 +479,28 @@ def query_table(table_name: str, conditions: str = "", limit: int = 10) -> str:
         query += f" LIMIT {limit}"
         
         # Execute the query
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
+        try:
+            cursor = await conn.execute(query)
+        except sqlite3.OperationalError as e:
+            if is_missing_table(e, table_name):
+                return f"Table '{table_name}' does not exist."
+            raise
         
-        conn.close()
+        rows = await cursor.fetchall()
+        column_names = [description[0] for description in cursor.description]
         
         if rows:
             # Format the results
-            result = f"Results from '{table_name}':\n"
-            
-            # Header
             header = " | ".join(column_names)
-            result += header + "\n"
-            result += "-" * len(header) + "\n"
-            
-            # Rows
-            for row in rows:
-                formatted_row = " | ".join(str(value) for value in row)
-                result += formatted_row + "\n"
+            lines = [f"Results from '{table_name}':", header, "-" * len(header)]
+            lines.extend(" | ".join(map(str, row)) for row in rows)
+            result = "\n".join(lines) + "\n"
             
             # Add a note if there might be more records
             if len(rows) == limit:
                 result += f"\n(Showing {limit} records. There may be more.)"
             
-            logger.info(f"Retrieved {len(rows)} records from '{table_name}'")
+            logger.info("Retrieved %s records from '%s'", len(rows), table_name)
             return result
         else:
             return f"No records found in '{table_name}'" + (f" with condition: {conditions}" if conditions else "")
@@ -363,47 +511,36 @@ def query_table(table_name: str, conditions: str = "", limit: int = 10) -> str:
         return error_msg
 
 @mcp.tool()
-def execute_safe_query(query: str) -> str:
+async def execute_safe_query(query: str) -> str:
     """
     Execute a safe SQL query (READ-ONLY for safety).
     query: The SQL query to execute
     Example: execute_safe_query("SELECT * FROM users WHERE age > 25 ORDER BY name LIMIT 10")
     """
-    logger.info(f"Executing safe query: {query}")
+    logger.info("Executing safe query: %s", query)
     
     # Check if the query is trying to modify data (for safety)
-    query_lower = query.lower().strip()
-    dangerous_keywords = ["insert", "update", "delete", "drop", "alter", "truncate", "create", "grant"]
-    
-    if any(keyword in query_lower for keyword in dangerous_keywords):
+    if _DANGEROUS_RE.search(query):
         return "For security reasons, this tool only allows SELECT queries"
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # The read-only connection rejects any write the keyword check misses
+        conn = await get_read_only_connection()
         
-        cursor.execute(query)
+        cursor = await conn.execute(query)
         
         # Try to fetch results
         try:
-            results = cursor.fetchall()
+            results = await cursor.fetchall()
             
             if results:
                 # Get column names
                 column_names = [description[0] for description in cursor.description]
                 
                 # Format the results
-                formatted_results = []
-                
-                # Header
                 header = " | ".join(column_names)
-                formatted_results.append(header)
-                formatted_results.append("-" * len(header))
-                
-                # Rows
-                for row in results:
-                    formatted_row = " | ".join(str(value) for value in row)
-                    formatted_results.append(formatted_row)
+                formatted_results = [header, "-" * len(header)]
+                formatted_results.extend(" | ".join(map(str, row)) for row in results)
                 
                 result = "\n".join(formatted_results)
                 if len(result) > 1500:  # Truncate if too long
@@ -414,9 +551,7 @@ def execute_safe_query(query: str) -> str:
             # No results to fetch
             result = "Query executed successfully"
         
-        conn.close()
-        
-        logger.info(f"Query executed successfully")
+        logger.info("Query executed successfully")
         return result
     
     except Exception as e:
@@ -425,33 +560,28 @@ def execute_safe_query(query: str) -> str:
         return error_msg
 
 @mcp.tool()
-def delete_table(table_name: str) -> str:
+async def delete_table(table_name: str) -> str:
     """Delete a table from the database."""
-    logger.info(f"Deleting table: {table_name}")
+    logger.info("Deleting table: %s", table_name)
     
     # Protect default tables
-    protected_tables = ['key_value_store', 'notes', 'table_registry', 'sqlite_master']
+    protected_tables = ['key_value_store', 'notes', 'table_registry', 'sqlite_master', *FTS_TABLES]
     if table_name.lower() in protected_tables:
         return f"Cannot delete table '{table_name}'. This is a system table."
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        if not cursor.fetchone():
-            conn.close()
-            return f"Table '{table_name}' does not exist."
+        conn = await get_db_connection()
         
         # Delete the table
-        cursor.execute(f"DROP TABLE {table_name}")
+        try:
+            await conn.execute(f"DROP TABLE {table_name}")
+        except sqlite3.OperationalError as e:
+            if is_missing_table(e, table_name):
+                return f"Table '{table_name}' does not exist."
+            raise
         
         # Remove from registry
-        cursor.execute("DELETE FROM table_registry WHERE table_name = ?", (table_name,))
-        
-        conn.commit()
-        conn.close()
+        await conn.execute("DELETE FROM table_registry WHERE table_name = ?", (table_name,))
         
         result = f"Successfully deleted table '{table_name}'."
         logger.info(result)
@@ -463,33 +593,17 @@ def delete_table(table_name: str) -> str:
         return error_msg
 
 @mcp.tool()
-def store_value(key: str, value: str) -> str:
+async def store_value(key: str, value: str) -> str:
     """Store a value with the given key in the database."""
-    logger.info(f"Storing value for key: {key}")
+    logger.info("Storing value for key: %s", key)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if key already exists
-        cursor.execute("SELECT key FROM key_value_store WHERE key = ?", (key,))
-        if cursor.fetchone():
-            # Update existing record
-            cursor.execute(
-                "UPDATE key_value_store SET value = ?, updated_at = CURRENT_TIMESTAMP WHERE key = ?",
-                (value, key)
-            )
-            result = f"Updated value for key '{key}'"
-        else:
-            # Insert new record
-            cursor.execute(
-                "INSERT INTO key_value_store (key, value) VALUES (?, ?)",
-                (key, value)
-            )
-            result = f"Stored new value for key '{key}'"
-        
-        conn.commit()
-        conn.close()
+        conn = await get_db_connection()
+        
+        # Insert the key or overwrite its value in a single statement
+        await conn.execute(SQL_STORE_VALUE, (key, value))
+        result = f"Stored value for key '{key}'"
+        
         logger.info(result)
         return result
     
@@ -499,24 +613,21 @@ def store_value(key: str, value: str) -> str:
         return error_msg
 
 @mcp.tool()
-def get_value(key: str) -> str:
+async def get_value(key: str) -> str:
     """Retrieve a value for the given key from the database."""
-    logger.info(f"Retrieving value for key: {key}")
+    logger.info("Retrieving value for key: %s", key)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        conn = await get_db_connection()
         
-        cursor.execute("SELECT value FROM key_value_store WHERE key = ?", (key,))
-        result = cursor.fetchone()
-        
-        conn.close()
+        async with conn.execute(SQL_GET_VALUE, (key,)) as cursor:
+            result = await cursor.fetchone()
         
         if result:
-            logger.info(f"Found value for key '{key}': {result['value']}")
+            logger.info("Found value for key '%s': %s", key, result['value'])
             return result["value"]
         else:
-            logger.info(f"No value found for key '{key}'")
+            logger.info("No value found for key '%s'", key)
             return f"No value found for key '{key}'"
     
     except Exception as e:
@@ -525,18 +636,15 @@ def get_value(key: str) -> str:
         return error_msg
 
 @mcp.tool()
-def list_keys() -> str:
+async def list_keys() -> str:
     """List all available keys in the database."""
     logger.info("Listing all keys")
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT key FROM key_value_store ORDER BY key")
-        keys = [row["key"] for row in cursor.fetchall()]
+        conn = await get_db_connection()
         
-        conn.close()
+        async with conn.execute(SQL_LIST_KEYS) as cursor:
+            keys = [row["key"] for row in await cursor.fetchall()]
         
         if keys:
             result = "Available keys: " + ", ".join(keys)
@@ -552,22 +660,16 @@ def list_keys() -> str:
         return error_msg
 
 @mcp.tool()
-def add_note(title: str, content: str, tags: str = "") -> str:
+async def add_note(title: str, content: str, tags: str = "") -> str:
     """Add a new note to the database."""
-    logger.info(f"Adding new note: {title}")
+    logger.info("Adding new note: %s", title)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        conn = await get_db_connection()
         
-        cursor.execute(
-            "INSERT INTO notes (title, content, tags) VALUES (?, ?, ?)",
-            (title, content, tags)
-        )
+        cursor = await conn.execute(SQL_ADD_NOTE, (title, content, tags))
         
         note_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
         
         result = f"Added note with ID {note_id}"
         logger.info(result)
@@ -579,27 +681,24 @@ def add_note(title: str, content: str, tags: str = "") -> str:
         return error_msg
 
 @mcp.tool()
-def get_note(note_id: int) -> str:
+async def get_note(note_id: int) -> str:
     """Retrieve a note by its ID."""
-    logger.info(f"Retrieving note with ID: {note_id}")
+    logger.info("Retrieving note with ID: %s", note_id)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM notes WHERE id = ?", (note_id,))
-        note = cursor.fetchone()
+        conn = await get_db_connection()
         
-        conn.close()
+        async with conn.execute(SQL_GET_NOTE, (note_id,)) as cursor:
+            note = await cursor.fetchone()
         
         if note:
             result = f"Title: {note['title']}\nContent: {note['content']}"
             if note['tags']:
                 result += f"\nTags: {note['tags']}"
-            logger.info(f"Found note with ID {note_id}")
+            logger.info("Found note with ID %s", note_id)
             return result
         else:
-            logger.info(f"No note found with ID {note_id}")
+            logger.info("No note found with ID %s", note_id)
             return f"No note found with ID {note_id}"
     
     except Exception as e:
@@ -608,30 +707,27 @@ def get_note(note_id: int) -> str:
         return error_msg
 
 @mcp.tool()
-def search_notes(query: str) -> str:
+async def search_notes(query: str) -> str:
     """Search for notes by title, content, or tags."""
-    logger.info(f"Searching notes for: {query}")
+    logger.info("Searching notes for: %s", query)
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Search in title, content, and tags
-        cursor.execute(
-            "SELECT id, title FROM notes WHERE title LIKE ? OR content LIKE ? OR tags LIKE ?",
-            (f"%{query}%", f"%{query}%", f"%{query}%")
-        )
+        conn = await get_db_connection()
         
-        results = cursor.fetchall()
-        conn.close()
+        # Search in title, content, and tags through the full-text index
+        fts_query = build_fts_query(query)
+        results = []
+        if fts_query:
+            async with conn.execute(SQL_SEARCH_NOTES, (fts_query,)) as cursor:
+                results = await cursor.fetchall()
         
         if results:
             result_list = [f"ID: {row['id']} - Title: {row['title']}" for row in results]
             result = "Found notes:\n" + "\n".join(result_list)
-            logger.info(f"Found {len(results)} notes matching '{query}'")
+            logger.info("Found %s notes matching '%s'", len(results), query)
             return result
         else:
-            logger.info(f"No notes found matching '{query}'")
+            logger.info("No notes found matching '%s'", query)
             return f"No notes found matching '{query}'"
     
     except Exception as e:
@@ -641,8 +737,5 @@ def search_notes(query: str) -> str:
 
 if __name__ == "__main__":
     logger.info("Starting database server with STDIO transport")
-    # Ensure the database connection works
-    conn = get_db_connection()
-    conn.close()
     # Run the MCP server with STDIO transport
     mcp.run(transport="stdio")
\ No newline at end of file